@@ -81,7 +81,9 @@ def _pad(s: str, width: int) -> str:
 
 def _parse_iso(s: str | None):
     """Parse an ISO datetime string, returning None on failure."""
-    if not s:
+    # Every ISO date starts with a digit; reject anything else without
+    # paying for fromisoformat's exception round-trip.
+    if not isinstance(s, str) or not s[:1].isdigit():
         return None
     from datetime import datetime, timezone
 
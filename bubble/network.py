@@ -16,9 +16,10 @@ import re
 
 from .runtime.base import ContainerRuntime
 
-# Valid domain pattern for allowlist entries
-_DOMAIN_RE = re.compile(r"^[a-zA-Z0-9.*-]+$")
-_IPV4_RE = re.compile(r"^(\d{1,3}\.){3}\d{1,3}$")
+# Valid domain pattern for allowlist entries. Use with fullmatch(): a
+# "^...$" pattern with match() would still accept a trailing newline.
+_DOMAIN_RE = re.compile(r"[a-zA-Z0-9.*-]+")
+_IPV4_RE = re.compile(r"(\d{1,3}\.){3}\d{1,3}")
 
 
 def apply_allowlist(
@@ -42,13 +43,13 @@ def apply_allowlist(
     """
     # Validate domains to prevent shell injection
     for domain in domains:
-        if not _DOMAIN_RE.match(domain):
+        if not _DOMAIN_RE.fullmatch(domain):
             raise ValueError(f"Invalid domain in allowlist: {domain!r}")
     endpoints = list(proxy_endpoints or [])
     if auth_proxy_endpoint is not None and auth_proxy_endpoint not in endpoints:
         endpoints.append(auth_proxy_endpoint)
     for ip, port in endpoints:
-        if not _IPV4_RE.match(ip):
+        if not _IPV4_RE.fullmatch(ip):
             raise ValueError(f"Invalid auth proxy IP: {ip!r}")
         if not isinstance(port, int) or not (0 < port < 65536):
             raise ValueError(f"Invalid auth proxy port: {port!r}")
@@ -58,6 +58,18 @@ GLOBAL_RATE_LIMIT_PER_HOUR = 30
 # Valid GitHub owner/repo name pattern
 _GITHUB_NAME_RE = re.compile(r"^[a-zA-Z0-9._-]+$")
 
+# Shell metacharacters rejected anywhere in a relay target
+_DANGEROUS_CHARS = frozenset(";|&$`\\(){}[]!#")
+
+# The common well-formed targets, owner/repo and owner/repo/pull/N. A match
+# (with no ".." or "--path" inside) passes every syntactic check below, so
+# validate_relay_target can skip straight to the known-repo lookup. Owners
+# cannot contain dots on GitHub, so a host such as "github.com/<short>" never
+# matches and still goes through parse_target's host stripping.
+_SIMPLE_TARGET_RE = re.compile(
+    r"([a-zA-Z0-9_][a-zA-Z0-9_-]*)/([a-zA-Z0-9._][a-zA-Z0-9._-]*)(?:/pull/\d+)?"
+)
+
 logger = logging.getLogger("bubble.relay")
 
 
@@ -128,6 +140,29 @@ def validate_relay_target(target: str) -> tuple[str, str]:
     if len(target) > MAX_TARGET_LENGTH:
         return "error", "Target too long."
 
+    m = _SIMPLE_TARGET_RE.fullmatch(target)
+    if m and ".." not in target and "--path" not in target:
+        org_repo = f"{m[1]}/{m[2]}"
+    else:
+        status, org_repo = _check_relay_target_syntax(target)
+        if status != "ok":
+            return status, org_repo
+
+    # Check that the repo is already known (cloned in ~/.bubble/git/)
+    if not repo_is_known(org_repo):
+        return "unknown_repo", (
+            f"Repo '{org_repo}' is not available. Open it outside of a bubble first."
+        )
+
+    return "ok", ""
+
+
+def _check_relay_target_syntax(target: str) -> tuple[str, str]:
+    """Run the full rejection checks on a target that missed the fast path.
+
+    Returns ("ok", "owner/repo") on success, or ("error", message) naming
+    the rule the target broke.
+    """
     # Reject local paths — containers must not access the host filesystem
     if target.startswith((".", "/", "~")):
         return "error", "Local paths are not allowed via relay."
@@ -140,8 +175,7 @@ def validate_relay_target(target: str) -> tuple[str, str]:
         return "error", "The --path flag is not allowed via relay."
 
     # Reject shell metacharacters
-    dangerous = set(";|&$`\\(){}[]!#")
-    if any(c in dangerous for c in target):
+    if not _DANGEROUS_CHARS.isdisjoint(target):
         return "error", "Invalid characters in target."
 
     # Reject path traversal sequences anywhere in the target
@@ -161,13 +195,7 @@ def validate_relay_target(target: str) -> tuple[str, str]:
     if not _GITHUB_NAME_RE.match(t.repo):
         return "error", f"Invalid repo name: {t.repo!r}"
 
-    # Check that the repo is already known (cloned in ~/.bubble/git/)
-    if not repo_is_known(t.org_repo):
-        return "unknown_repo", (
-            f"Repo '{t.org_repo}' is not available. Open it outside of a bubble first."
-        )
-
-    return "ok", ""
+    return "ok", t.org_repo
 
 
 def _setup_logging():
@@ -183,13 +211,20 @@ def _handle_connection(
     """Handle a single relay connection."""
     try:
         conn.settimeout(5.0)
-        data = conn.recv(MAX_REQUEST_SIZE)
-        if not data:
+        # One read into a buffer one byte larger than the limit: anything
+        # that fills it is oversized and is rejected without parsing.
+        buf = bytearray(MAX_REQUEST_SIZE + 1)
+        n = conn.recv_into(buf)
+        if not n:
+            return
+        if n > MAX_REQUEST_SIZE:
+            _send_response(conn, "error", "Request too large.")
+            logger.info("REJECT  oversized request")
             return
 
         # Parse JSON request
         try:
-            request = json.loads(data.decode("utf-8", errors="replace"))
+            request = json.loads(buf[:n].decode("utf-8", errors="replace"))
         except (json.JSONDecodeError, UnicodeDecodeError):
             _send_response(conn, "error", "Invalid request format.")
             logger.info("REJECT  malformed JSON")
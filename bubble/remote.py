@@ -12,7 +12,7 @@ from pathlib import Path
 
 from . import __version__
 
-_SAFE_NAME_RE = re.compile(r"^[a-zA-Z0-9_][a-zA-Z0-9._-]*$")
+_SAFE_NAME_RE = re.compile(r"[a-zA-Z0-9_][a-zA-Z0-9._-]*")
 
 
 @dataclass
@@ -59,12 +59,12 @@ class RemoteHost:
 
         # Validate hostname and user to prevent SSH option injection
         # (e.g., "-oProxyCommand=...") and shell metacharacter injection.
-        if not _SAFE_NAME_RE.match(spec):
+        if not _SAFE_NAME_RE.fullmatch(spec):
             raise ValueError(
                 f"Invalid hostname: {spec!r} "
                 f"(must be alphanumeric, dots, hyphens; cannot start with -)"
             )
-        if user and not _SAFE_NAME_RE.match(user):
+        if user and not _SAFE_NAME_RE.fullmatch(user):
             raise ValueError(
                 f"Invalid user: {user!r} (must be alphanumeric, dots, hyphens; cannot start with -)"
             )
@@ -178,7 +178,9 @@ def _create_bundle() -> Path:
     os.close(fd)
     bundle_path = Path(bundle_path_str)
 
-    with tarfile.open(bundle_path, "w:gz") as tar:
+    # The bundle is transient (copied once over SSH, then deleted), so favour
+    # pack speed over ratio: level 1 is several times faster than the default 9.
+    with tarfile.open(bundle_path, "w:gz", compresslevel=1) as tar:
         for name, pkg_dir in packages.items():
             # Use the directory name as the arcname (e.g., bubble/, click/)
             for root, dirs, files in os.walk(pkg_dir):
@@ -23,7 +23,9 @@ class RepoRegistry:
         self._path = path or REPOS_FILE
         self._repos: dict[str, dict] = {}  # short_name -> {"owner": ..., "repo": ..., ...}
         self._ambiguous: dict[str, list[str]] = {}  # short_name -> [owner/repo, ...]
+        self._lookup: dict[str, str] = {}  # short_name -> owner/repo, as resolve() answers
         self._load()
+        self._rebuild_lookup()
 
     def _load(self):
         if self._path.exists():
@@ -39,17 +41,19 @@ class RepoRegistry:
         self._path.parent.mkdir(parents=True, exist_ok=True)
         data = {"repos": self._repos, "ambiguous": self._ambiguous}
         self._path.write_text(json.dumps(data, indent=2) + "\n")
+        self._rebuild_lookup()
+
+    def _rebuild_lookup(self):
+        """Flatten defaults, learned repos and ambiguity into one resolve table."""
+        lookup = dict(_DEFAULT_REPOS)
+        lookup.update(self.list_all())
+        for short in self._ambiguous:
+            lookup.pop(short, None)
+        self._lookup = lookup
 
     def resolve(self, short_name: str) -> str | None:
         """Resolve a short name to owner/repo. Returns None if unknown or ambiguous."""
-        lower = short_name.lower()
-        if lower in self._ambiguous:
-            return None
-        entry = self._repos.get(lower)
-        if entry:
-            return f"{entry['owner']}/{entry['repo']}"
-        # Fall back to built-in defaults.
-        return _DEFAULT_REPOS.get(lower)
+        return self._lookup.get(short_name.lower())
 
     def register(self, owner: str, repo: str):
         """Record a repo usage. Auto-learns short name mapping."""
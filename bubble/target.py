@@ -1,12 +1,17 @@
 """GitHub URL and target string parsing."""
 
-import re
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
 
 from .repo_registry import RepoRegistry
 
+# GitHub remote URL prefixes accepted by _parse_github_remote
+_GITHUB_REMOTE_PREFIXES = ("git@github.com:", "https://github.com/", "http://github.com/")
+
+# Host prefixes stripped from a target once any URL scheme is gone
+_GITHUB_HOSTS = ("github.com/", "www.github.com/")
+
 
 class TargetParseError(Exception):
     """Raised when a target string cannot be parsed."""
@@ -43,39 +48,45 @@ def _parse_github_remote(url: str) -> tuple[str, str]:
       git@github.com:owner/repo.git
       git@github.com:owner/repo
     """
-    # SSH format: git@github.com:owner/repo.git
-    m = re.match(r"git@github\.com:([^/]+)/([^/]+?)(?:\.git)?$", url)
-    if m:
-        return m.group(1), m.group(2)
-
-    # HTTPS format: https://github.com/owner/repo.git
-    m = re.match(r"https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?$", url)
-    if m:
-        return m.group(1), m.group(2)
+    for prefix in _GITHUB_REMOTE_PREFIXES:
+        if url.startswith(prefix):
+            owner, sep, repo = url[len(prefix) :].partition("/")
+            # A repo literally named ".git" keeps its name rather than becoming ""
+            repo = repo.removesuffix(".git") or repo
+            if owner and sep and repo and "/" not in repo:
+                return owner, repo
+            break
 
     raise TargetParseError(f"Remote URL is not a GitHub repository: {url}")
 
 
-def _git_repo_info(path: str) -> tuple[str, str, str]:
-    """Extract (owner, repo, repo_root) from a local git checkout.
+def _git_root_and_head(abs_path: str) -> tuple[str, str]:
+    """Return (repo_root, head) for a path inside a git checkout.
 
-    Raises TargetParseError if not a git repo or no GitHub remote.
-    """
-    abs_path = str(Path(path).resolve())
+    One rev-parse call answers both. head is the checked-out branch name,
+    "HEAD" when detached, or "" when the branch has no commits yet (git then
+    exits non-zero but still prints the top level).
 
-    # Check it's a git repo and find root
+    Raises TargetParseError if not a git repo.
+    """
     try:
         result = subprocess.run(
-            ["git", "-C", abs_path, "rev-parse", "--show-toplevel"],
+            ["git", "-C", abs_path, "rev-parse", "--show-toplevel", "--abbrev-ref", "HEAD"],
             capture_output=True,
             text=True,
-            check=True,
         )
-        repo_root = result.stdout.strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except FileNotFoundError:
         raise TargetParseError(f"{abs_path} is not a git repository.")
 
-    # Get remote URL
+    lines = result.stdout.splitlines()
+    if not lines or not lines[0]:
+        raise TargetParseError(f"{abs_path} is not a git repository.")
+    head = lines[1] if result.returncode == 0 and len(lines) > 1 else ""
+    return lines[0], head
+
+
+def _github_origin(repo_root: str) -> tuple[str, str]:
+    """Return (owner, repo) from the checkout's 'origin' GitHub remote."""
     try:
         result = subprocess.run(
             ["git", "-C", repo_root, "remote", "get-url", "origin"],
@@ -94,7 +105,16 @@ def _git_repo_info(path: str) -> tuple[str, str, str]:
             "No remote 'origin' found. bubble needs a GitHub remote to clone from."
         )
 
-    owner, repo = _parse_github_remote(remote_url)
+    return _parse_github_remote(remote_url)
+
+
+def _git_repo_info(path: str) -> tuple[str, str, str]:
+    """Extract (owner, repo, repo_root) from a local git checkout.
+
+    Raises TargetParseError if not a git repo or no GitHub remote.
+    """
+    repo_root, _ = _git_root_and_head(str(Path(path).resolve()))
+    owner, repo = _github_origin(repo_root)
     return owner, repo, repo_root
 
 
@@ -157,34 +177,28 @@ def _parse_local_path(raw: str) -> Target:
     clean working tree and a checked-out branch. The branch does NOT
     need to be pushed — local objects are shared via --reference.
     """
-    path = Path(raw).resolve()
-    if not path.exists():
+    # strict resolution fails on a missing path, so no separate exists() stat
+    try:
+        path = Path(raw).resolve(strict=True)
+    except OSError:
         raise TargetParseError(f"Path does not exist: {raw}")
 
-    owner, repo, repo_root = _git_repo_info(str(path))
+    repo_root, branch = _git_root_and_head(str(path))
+    owner, repo = _github_origin(repo_root)
 
-    # Get current branch
-    try:
-        result = subprocess.run(
-            ["git", "-C", repo_root, "symbolic-ref", "--short", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        branch = result.stdout.strip()
-    except subprocess.CalledProcessError:
+    if branch == "HEAD":
         raise TargetParseError("HEAD is detached. Check out a branch first.")
-
     if not branch:
-        raise TargetParseError("HEAD is detached. Check out a branch first.")
+        raise TargetParseError("The current branch has no commits yet. Commit something first.")
 
-    # Check for modified/staged files (ignore untracked)
+    # Check for modified/staged files (ignore untracked). "diff --quiet HEAD"
+    # stops at the first difference and, unlike plumbing diff-index, re-checks
+    # content for files whose index stat info is merely stale (e.g. touched).
     result = subprocess.run(
-        ["git", "-C", repo_root, "status", "--porcelain", "-uno"],
+        ["git", "-C", repo_root, "diff", "--quiet", "HEAD", "--"],
         capture_output=True,
-        text=True,
     )
-    if result.stdout.strip():
+    if result.returncode != 0:
         raise TargetParseError("Working tree has uncommitted changes. Commit or stash them first.")
 
     return Target(
@@ -197,6 +211,25 @@ def _parse_local_path(raw: str) -> Target:
     )
 
 
+def _parse_bare_number(number: str, original: str) -> Target:
+    """Parse a bare PR/issue number against the current directory's repo."""
+    try:
+        owner, repo, _ = _git_repo_info(".")
+        kind = _check_github_number_kind(owner, repo, number)
+        return Target(
+            owner=owner,
+            repo=repo,
+            kind=kind,
+            ref=number,
+            original=original,
+        )
+    except TargetParseError:
+        raise TargetParseError(
+            f"'{number}' looks like a PR/issue number, but the current directory "
+            f"is not a git repository with a GitHub remote."
+        )
+
+
 def parse_target(raw: str, registry: RepoRegistry) -> Target:
     """Parse a target string into a Target.
 
@@ -216,18 +249,29 @@ def parse_target(raw: str, registry: RepoRegistry) -> Target:
     s = raw.strip()
     original = s
 
+    # Bare number: PR or issue in current directory's repo. Checked first
+    # since it is a common form and none of the stripping below applies.
+    if s.isdigit():
+        return _parse_bare_number(s, original)
+
     # Local filesystem paths: start with . or /
     if s.startswith(("/", ".", "..")):
         return _parse_local_path(s)
 
     # Strip URL scheme
-    s = re.sub(r"^https?://", "", s)
+    if s.startswith(("https://", "http://")):
+        s = s.partition("://")[2]
 
-    # Strip fragment and query string (e.g. #issuecomment-123, ?query=1)
-    s = re.sub(r"[#?].*$", "", s)
+    # Strip fragment and query string (e.g. #issuecomment-123, ?query=1):
+    # cutting at each separator in turn leaves everything before the first
+    for sep in "#?":
+        s = s.partition(sep)[0]
 
-    # Strip github.com/ prefix
-    s = re.sub(r"^github\.com/", "", s)
+    # Strip github.com/ (or www.github.com/) prefix
+    for host in _GITHUB_HOSTS:
+        if s.startswith(host):
+            s = s[len(host) :]
+            break
 
     # Strip trailing slash
     s = s.rstrip("/")
@@ -235,23 +279,9 @@ def parse_target(raw: str, registry: RepoRegistry) -> Target:
     if not s:
         raise TargetParseError(f"Empty target: {raw!r}")
 
-    # Bare number: PR or issue in current directory's repo
+    # Bare number with URL decoration (e.g. "123/" or "123#top")
     if s.isdigit():
-        try:
-            owner, repo, _ = _git_repo_info(".")
-            kind = _check_github_number_kind(owner, repo, s)
-            return Target(
-                owner=owner,
-                repo=repo,
-                kind=kind,
-                ref=s,
-                original=original,
-            )
-        except TargetParseError:
-            raise TargetParseError(
-                f"'{s}' looks like a PR/issue number, but the current directory "
-                f"is not a git repository with a GitHub remote."
-            )
+        return _parse_bare_number(s, original)
 
     parts = s.split("/")
 
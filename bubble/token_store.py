@@ -2,19 +2,23 @@
 
 Used by both the relay daemon (relay.py) and auth proxy (auth_proxy.py).
 Provides:
-- TokenStore: file-based JSON persistence with fcntl locking and mtime caching
+- TokenStore: file-based JSON persistence with fcntl locking, mtime caching
+  and digest-indexed lookups
 - RateLimiter: sliding-window rate limiter with configurable windows
 - setup_file_logging: timestamped file-based logging
 """
 
+import contextlib
 import fcntl
+import hashlib
 import json
 import logging
 import os
 import secrets
+import tempfile
 import threading
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable
@@ -34,12 +38,17 @@ class TokenStore:
     Provides atomic read-modify-write via file locking (preventing races
     when multiple processes generate tokens concurrently) and thread-safe
     lookups via mtime-based cache invalidation (for daemon hot-reload).
+
+    Lookups go through a SHA-256 digest index rather than the raw token
+    strings, so the time a lookup takes reveals nothing about how much of a
+    guessed token matches a real one.
     """
 
     def __init__(self, path: Path):
         self._path = path
         self._tokens: dict = {}
-        self._mtime_ns: int = 0
+        self._by_digest: dict[bytes, Any] = {}
+        self._stamp: tuple[int, int, int] | None = None
         self._thread_lock = threading.Lock()
 
     def _file_lock(self):
@@ -68,10 +77,17 @@ class TokenStore:
     def _save(self, tokens: dict):
         """Atomically save tokens to disk with owner-only permissions."""
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        tmp = self._path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(tokens))
-        tmp.replace(self._path)
-        os.chmod(str(self._path), 0o600)
+        # mkstemp creates the file 0600, so the secrets are never readable by
+        # others, not even in the temp file before the rename
+        fd, tmp = tempfile.mkstemp(prefix=self._path.name + ".", dir=str(self._path.parent))
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(tokens))
+            os.replace(tmp, self._path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp)
+            raise
 
     def generate(self, value: Any) -> str:
         """Generate a new token mapped to value, with file locking.
@@ -100,9 +116,10 @@ class TokenStore:
 
     def lookup(self, token: str) -> Any | None:
         """Thread-safe token lookup with mtime-based cache invalidation."""
+        digest = _token_digest(token)
         with self._thread_lock:
             self._maybe_reload()
-            return self._tokens.get(token)
+            return self._by_digest.get(digest)
 
     def values(self) -> list[Any]:
         """Return a snapshot of all stored values."""
@@ -117,15 +134,28 @@ class TokenStore:
             return list(self._tokens.items())
 
     def _maybe_reload(self):
-        """Reload from disk if the file has been modified."""
+        """Reload from disk if the file has been modified.
+
+        The cache key includes the inode and size as well as the mtime:
+        _save() always replaces the file, so two writes landing in the same
+        mtime tick (coarse-grained filesystems) still invalidate the cache.
+        """
         try:
             st = self._path.stat()
-            if st.st_mtime_ns != self._mtime_ns:
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+            if stamp != self._stamp:
                 self._tokens = self._load()
-                self._mtime_ns = st.st_mtime_ns
+                self._by_digest = {_token_digest(t): v for t, v in self._tokens.items()}
+                self._stamp = stamp
         except FileNotFoundError:
             self._tokens = {}
-            self._mtime_ns = 0
+            self._by_digest = {}
+            self._stamp = None
+
+
+def _token_digest(token: str) -> bytes:
+    """SHA-256 of a token, used as the lookup key instead of the secret itself."""
+    return hashlib.sha256(token.encode("utf-8", "surrogatepass")).digest()
 
 
 class RateLimiter:
@@ -134,6 +164,11 @@ class RateLimiter:
     Supports per-key rate limits with multiple time windows,
     optional global rate limiting, and automatic eviction of
     stale tracking entries.
+
+    Each key keeps one timestamp deque per window, so a check only pops
+    expired entries and compares lengths: O(1) amortized, and no window
+    ever rescans the history of a larger one. Keys are kept in order of
+    their most recent recorded request, so eviction is also O(1).
     """
 
     def __init__(
@@ -145,8 +180,10 @@ class RateLimiter:
         self._windows = windows
         self._global_per_hour = global_per_hour
         self._max_tracked = max_tracked
-        self._requests: dict[str, deque] = {}
-        self._global: deque = deque()
+        self._requests: OrderedDict[str, list[deque[float]]] = OrderedDict()
+        # check() rejects before appending once the limit is reached, so the
+        # bound never drops a live entry; it just caps memory.
+        self._global: deque[float] = deque(maxlen=global_per_hour)
         self._lock = threading.Lock()
 
     def check(self, key: str) -> bool:
@@ -155,36 +192,29 @@ class RateLimiter:
         with self._lock:
             # Global rate limit
             if self._global_per_hour is not None:
-                while self._global and self._global[0] < now - 3600:
+                hour_ago = now - 3600
+                while self._global and self._global[0] < hour_ago:
                     self._global.popleft()
                 if len(self._global) >= self._global_per_hour:
                     return False
 
-            # Evict oldest key if too many tracked
+            # Evict the key with the oldest most-recent request if too many tracked
             if key not in self._requests and len(self._requests) >= self._max_tracked:
-                oldest_key = min(
-                    self._requests,
-                    key=lambda k: self._requests[k][-1] if self._requests[k] else 0,
-                )
-                del self._requests[oldest_key]
-
-            q = self._requests.setdefault(key, deque())
-
-            # Prune entries older than the largest window
-            max_seconds = max(w.seconds for w in self._windows)
-            while q and q[0] < now - max_seconds:
-                q.popleft()
-
-            # Check each window
-            for w in self._windows:
-                if w.seconds >= max_seconds:
-                    count = len(q)
-                else:
-                    count = sum(1 for t in q if t > now - w.seconds)
-                if count >= w.max_count:
+                self._requests.popitem(last=False)
+
+            queues = self._requests.setdefault(key, [deque() for _ in self._windows])
+
+            # Prune and check each window against its own queue
+            for queue, w in zip(queues, self._windows, strict=True):
+                cutoff = now - w.seconds
+                while queue and queue[0] <= cutoff:
+                    queue.popleft()
+                if len(queue) >= w.max_count:
                     return False
 
-            q.append(now)
+            for queue in queues:
+                queue.append(now)
+            self._requests.move_to_end(key)
             if self._global_per_hour is not None:
                 self._global.append(now)
             return True
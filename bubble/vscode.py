@@ -142,7 +142,7 @@ def add_ssh_config(
             ``bubble-colima:<name>`` because Bubble deliberately leaves the
             user's default Incus remote unchanged.
     """
-    if not _BUBBLE_NAME_RE.match(bubble_name):
+    if not _BUBBLE_NAME_RE.fullmatch(bubble_name):
         raise ValueError(f"Invalid bubble name for SSH config: {bubble_name!r}")
 
     target = container_target or bubble_name
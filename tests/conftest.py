@@ -222,25 +222,34 @@ def tmp_ssh_dir(tmp_path, monkeypatch):
 
 @pytest.fixture
 def relay_env(tmp_path, monkeypatch):
-    """Set BUBBLE_HOME to tmp_path and reload relay-related modules."""
-    import importlib
+    """Redirect relay, git store and repo registry paths to tmp_path.
 
+    Patches the module globals directly instead of reloading modules, so
+    nothing outlives the test and other modules keep their bindings.
+    """
     import bubble.config
     import bubble.git_store
     import bubble.relay
+    import bubble.repo_registry
 
     monkeypatch.setenv("BUBBLE_HOME", str(tmp_path))
-    importlib.reload(bubble.config)
-    importlib.reload(bubble.git_store)
-    importlib.reload(bubble.relay)
     git_dir = tmp_path / "git" / "github.com"
+    repos_file = tmp_path / "repos.json"
+    monkeypatch.setattr(bubble.config, "DATA_DIR", tmp_path)
     monkeypatch.setattr(bubble.config, "HOST_DATA_DIR", tmp_path)
     monkeypatch.setattr(bubble.config, "GIT_DIR", git_dir)
     monkeypatch.setattr(bubble.config, "LEGACY_GIT_DIR", tmp_path / "legacy-git")
+    monkeypatch.setattr(bubble.config, "REPOS_FILE", repos_file)
     monkeypatch.setattr(bubble.git_store, "GIT_DIR", git_dir)
     monkeypatch.setattr(bubble.git_store, "LEGACY_GIT_DIR", tmp_path / "legacy-git")
     monkeypatch.setattr(bubble.git_store, "GIT_LOCK_DIR", tmp_path / "locks" / "git")
     monkeypatch.setattr(bubble.git_store, "HOST_DATA_DIR", tmp_path)
+    monkeypatch.setattr(bubble.repo_registry, "REPOS_FILE", repos_file)
+    monkeypatch.setattr(bubble.relay, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(bubble.relay, "RELAY_SOCK", tmp_path / "relay.sock")
+    monkeypatch.setattr(bubble.relay, "RELAY_PORT_FILE", tmp_path / "relay.port")
+    monkeypatch.setattr(bubble.relay, "RELAY_LOG", tmp_path / "relay.log")
+    monkeypatch.setattr(bubble.relay, "RELAY_TOKENS", tmp_path / "relay-tokens.json")
     return tmp_path
 
 
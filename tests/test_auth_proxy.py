@@ -235,9 +235,8 @@ class TestProxyRateLimiter:
     def test_old_entries_pruned(self):
         rl = ProxyRateLimiter()
         now = time.time()
-        q = rl._requests.setdefault("c1", deque())
-        for _ in range(600):
-            q.append(now - 4000)  # Over an hour ago
+        # Over an hour ago, in both the minute and hour windows
+        rl._requests["c1"] = [deque([now - 4000] * 600) for _ in rl._windows]
         assert rl.check("c1") is True
 
     def test_container_eviction(self):
@@ -246,8 +245,7 @@ class TestProxyRateLimiter:
         from bubble.auth_proxy import MAX_TRACKED_CONTAINERS
 
         for i in range(MAX_TRACKED_CONTAINERS):
-            q = rl._requests.setdefault(f"container-{i}", deque())
-            q.append(now - 3500)
+            rl._requests[f"container-{i}"] = [deque([now - 3500]) for _ in rl._windows]
         assert rl.check("new-container") is True
         assert len(rl._requests) <= MAX_TRACKED_CONTAINERS
 
@@ -1414,7 +1412,7 @@ class TestPreflightRateLimiting:
         result = handler._preflight_check("node-1", "c1")
         assert result is None
         assert len(calls) == 1
-        assert len(handler.rate_limiter._requests["c1"]) == 1
+        assert [len(q) for q in handler.rate_limiter._requests["c1"]] == [1, 1]
 
     def test_preflight_blocked_when_rate_limited(self, monkeypatch):
         """When the container is over its window, preflight skips upstream."""
@@ -1455,7 +1453,7 @@ class TestPreflightRateLimiting:
 
         assert len(calls) == 1
         # And only one rate-limit slot was consumed.
-        assert len(handler.rate_limiter._requests["c1"]) == 1
+        assert [len(q) for q in handler.rate_limiter._requests["c1"]] == [1, 1]
 
     def test_preflight_positive_result_cached(self, monkeypatch):
         handler = self._make_handler()
@@ -1544,12 +1542,12 @@ class TestPreflightRateLimiting:
 
         assert handler._get_repo_node_id("o", "r", "c1") == "R_xyz"
         assert len(calls) == 1
-        assert len(handler.rate_limiter._requests["c1"]) == 1
+        assert [len(q) for q in handler.rate_limiter._requests["c1"]] == [1, 1]
 
         # Cached: no further upstream calls, no further quota consumed.
         assert handler._get_repo_node_id("o", "r", "c1") == "R_xyz"
         assert len(calls) == 1
-        assert len(handler.rate_limiter._requests["c1"]) == 1
+        assert [len(q) for q in handler.rate_limiter._requests["c1"]] == [1, 1]
 
     def test_preflight_transient_exception_not_cached(self, monkeypatch):
         """A network/HTTP error must NOT poison the cache: a single bad
@@ -1653,7 +1651,7 @@ class TestPreflightRateLimiting:
         # Exactly one upstream call across all 8 concurrent handlers.
         assert len(attempts) == 1
         # And only one rate-limit slot consumed (by the leader).
-        total_slots = sum(len(q) for q in handler.rate_limiter._requests.values())
+        total_slots = sum(len(queues[0]) for queues in handler.rate_limiter._requests.values())
         assert total_slots == 1
 
     def test_repo_node_id_blocked_when_rate_limited(self, monkeypatch):
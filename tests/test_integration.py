@@ -8,6 +8,7 @@ Mark: @pytest.mark.integration
 Skip locally with: pytest -m "not integration"
 """
 
+import time
 import uuid
 
 import pytest
@@ -39,20 +40,34 @@ def _check_base_image(runtime):
         pytest.skip("base image not built")
 
 
-@pytest.fixture
-def container(runtime, _check_base_image):
-    """Launch a fresh container from base, delete on teardown."""
-    name = f"ci-test-{uuid.uuid4().hex[:8]}"
-    runtime.launch(name, "base")
-    # Wait for container to be ready
-    for _ in range(15):
+def _poll(fn, max_wait=10.0):
+    """Call fn() until it returns truthy or max_wait seconds have elapsed.
+
+    Sleeps with exponential backoff (50ms doubling up to 1s), so readiness
+    that arrives early is noticed early. Exceptions from fn() count as
+    "not ready yet". Returns whether fn() eventually succeeded.
+    """
+    deadline = time.monotonic() + max_wait
+    delay = 0.05
+    while True:
         try:
-            runtime.exec(name, ["true"])
-            break
+            if fn():
+                return True
         except Exception:
-            import time
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 1.0)
+
 
-            time.sleep(0.5)
+def _launch_container(runtime):
+    """Launch a fresh container from base, yield its name, delete on teardown."""
+    name = f"ci-test-{uuid.uuid4().hex[:8]}"
+    runtime.launch(name, "base")
+    # Wait for container to be ready
+    _poll(lambda: runtime.exec(name, ["true"]) is not None, max_wait=7.5)
     yield name
     try:
         runtime.delete(name, force=True)
@@ -61,24 +76,33 @@ def container(runtime, _check_base_image):
 
 
 @pytest.fixture
-def container_with_allowlist(runtime, container):
-    """Container with network allowlist applied (waits for DNS readiness)."""
-    import time
+def container(runtime, _check_base_image):
+    """Launch a fresh container from base, delete on teardown."""
+    yield from _launch_container(runtime)
+
+
+@pytest.fixture(scope="class")
+def class_container(runtime, _check_base_image):
+    """Container shared by every test in a class; only for read-only tests."""
+    yield from _launch_container(runtime)
+
+
+@pytest.fixture(scope="class")
+def container_with_allowlist(runtime, class_container):
+    """Container with network allowlist applied (waits for DNS readiness).
 
+    Class-scoped: the allowlist tests only inspect the installed rules, so
+    one container and one apply_allowlist() run serve the whole class.
+    """
     # Wait for DNS resolver to be available (needed for allowlist)
-    for _ in range(20):
-        try:
-            resolver = runtime.exec(
-                container,
-                ["bash", "-c", "grep -m1 nameserver /etc/resolv.conf | awk '{print $2}'"],
-            ).strip()
-            if resolver:
-                break
-        except Exception:
-            pass
-        time.sleep(0.5)
-    apply_allowlist(runtime, container, ["github.com", "*.githubusercontent.com"])
-    return container
+    _poll(
+        lambda: runtime.exec(
+            class_container,
+            ["bash", "-c", "grep -m1 nameserver /etc/resolv.conf | awk '{print $2}'"],
+        ).strip()
+    )
+    apply_allowlist(runtime, class_container, ["github.com", "*.githubusercontent.com"])
+    return class_container
 
 
 # ---------------------------------------------------------------------------
@@ -1,11 +1,21 @@
 """Tests for remote-aware bubble list."""
 
+import json
+
 from bubble.cloud import _save_state
 from bubble.commands.list_cmd import _is_cloud_host, _parse_iso, _remote_entries_from_registry
-from bubble.lifecycle import register_bubble
 from bubble.remote import RemoteHost, apply_cloud_ssh_options
 
 
+def _seed_registry(bubbles: dict[str, dict]):
+    """Write registry entries directly, bypassing register_bubble's locked rewrite."""
+    import bubble.config as config
+
+    for info in bubbles.values():
+        info.setdefault("created_at", "2025-02-17T10:30:00+00:00")
+    config.REGISTRY_FILE.write_text(json.dumps({"bubbles": bubbles}))
+
+
 class TestParseIso:
     """Test ISO datetime parsing helper."""
 
@@ -23,6 +33,9 @@ class TestParseIso:
     def test_invalid_string(self):
         assert _parse_iso("not-a-date") is None
 
+    def test_invalid_digit_prefixed_string(self):
+        assert _parse_iso("2025-13-45") is None
+
     def test_naive_datetime_gets_utc(self):
         dt = _parse_iso("2025-02-17T10:30:00")
         assert dt is not None
@@ -75,39 +88,40 @@ class TestRemoteEntriesFromRegistry:
         assert _remote_entries_from_registry() == []
 
     def test_local_bubbles_skipped(self, tmp_data_dir):
-        register_bubble("local-bubble", "owner/repo")
+        _seed_registry({"local-bubble": {"org_repo": "owner/repo"}})
         assert _remote_entries_from_registry() == []
 
     def test_remote_bubbles_included(self, tmp_data_dir):
-        register_bubble("remote-bubble", "owner/repo", remote_host="root@1.2.3.4")
-        entries = _remote_entries_from_registry()
-        assert len(entries) == 1
-        assert entries[0]["name"] == "remote-bubble"
-        assert entries[0]["state"] == "unknown"
-        assert entries[0]["remote_host_spec"] == "root@1.2.3.4"
+        _seed_registry({"remote-bubble": {"org_repo": "owner/repo", "remote_host": "root@1.2.3.4"}})
+        (entry,) = _remote_entries_from_registry()
+        assert entry["name"] == "remote-bubble"
+        assert entry["state"] == "unknown"
+        assert entry["remote_host_spec"] == "root@1.2.3.4"
 
     def test_cloud_location_detected(self, tmp_data_dir):
         _save_state({"ipv4": "1.2.3.4", "server_id": 1})
-        register_bubble("cloud-bubble", "owner/repo", remote_host="root@1.2.3.4")
-        entries = _remote_entries_from_registry()
-        assert len(entries) == 1
-        assert entries[0]["location"] == "cloud"
+        _seed_registry({"cloud-bubble": {"org_repo": "owner/repo", "remote_host": "root@1.2.3.4"}})
+        (entry,) = _remote_entries_from_registry()
+        assert entry["location"] == "cloud"
 
     def test_ssh_location_shows_spec(self, tmp_data_dir):
-        register_bubble("ssh-bubble", "owner/repo", remote_host="user@myserver")
-        entries = _remote_entries_from_registry()
-        assert len(entries) == 1
-        assert entries[0]["location"] == "user@myserver"
+        _seed_registry({"ssh-bubble": {"org_repo": "owner/repo", "remote_host": "user@myserver"}})
+        (entry,) = _remote_entries_from_registry()
+        assert entry["location"] == "user@myserver"
 
     def test_multiple_hosts(self, tmp_data_dir):
-        register_bubble("b1", "owner/repo1", remote_host="root@1.2.3.4")
-        register_bubble("b2", "owner/repo2", remote_host="user@other")
+        _seed_registry(
+            {
+                "b1": {"org_repo": "owner/repo1", "remote_host": "root@1.2.3.4"},
+                "b2": {"org_repo": "owner/repo2", "remote_host": "user@other"},
+            }
+        )
         entries = _remote_entries_from_registry()
         assert len(entries) == 2
         names = {e["name"] for e in entries}
         assert names == {"b1", "b2"}
 
     def test_created_at_parsed(self, tmp_data_dir):
-        register_bubble("b1", "owner/repo", remote_host="root@1.2.3.4")
-        entries = _remote_entries_from_registry()
-        assert entries[0]["created_at"] is not None
+        _seed_registry({"b1": {"org_repo": "owner/repo", "remote_host": "root@1.2.3.4"}})
+        (entry,) = _remote_entries_from_registry()
+        assert entry["created_at"] is not None
@@ -5,45 +5,44 @@ import pytest
 from bubble.network import _DOMAIN_RE, _build_allowlist_script, apply_allowlist
 
 
+@pytest.fixture(scope="module")
+def github_script():
+    """Allowlist script for ["github.com"], shared by the read-only checks below."""
+    return _build_allowlist_script(["github.com"])
+
+
 class TestBuildAllowlistScript:
     """Verify the generated iptables script has correct security properties."""
 
-    def test_ipv6_blocked(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "ip6tables -P OUTPUT DROP" in script
+    def test_ipv6_blocked(self, github_script):
+        assert "ip6tables -P OUTPUT DROP" in github_script
 
-    def test_ipv4_default_deny(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "iptables -P OUTPUT DROP" in script
+    def test_ipv4_default_deny(self, github_script):
+        assert "iptables -P OUTPUT DROP" in github_script
 
-    def test_uses_ahostsv4_not_ahosts(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "getent ahostsv4" in script
+    def test_uses_ahostsv4_not_ahosts(self, github_script):
+        assert "getent ahostsv4" in github_script
         # Should not have bare "getent ahosts " (without v4)
-        lines = script.splitlines()
+        lines = github_script.splitlines()
         for line in lines:
             if "getent" in line:
                 assert "ahostsv4" in line
 
-    def test_dns_restricted_to_resolver(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "RESOLVER=" in script
-        assert "$RESOLVER" in script
-        assert "dport 53" in script
+    def test_dns_restricted_to_resolver(self, github_script):
+        assert "RESOLVER=" in github_script
+        assert "$RESOLVER" in github_script
+        assert "dport 53" in github_script
 
-    def test_no_ssh_rules(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "--dport 22" not in script
-        assert "--sport 22" not in script
+    def test_no_ssh_rules(self, github_script):
+        assert "--dport 22" not in github_script
+        assert "--sport 22" not in github_script
 
-    def test_domain_appears_in_getent_call(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "getent ahostsv4 github.com" in script
+    def test_domain_appears_in_getent_call(self, github_script):
+        assert "getent ahostsv4 github.com" in github_script
 
-    def test_exact_domains_use_resolved_ips_on_https_only(self):
-        script = _build_allowlist_script(["github.com"])
-        assert ".0/24" not in script
-        assert "-d $ip -p tcp --dport 443 -j ACCEPT" in script
+    def test_exact_domains_use_resolved_ips_on_https_only(self, github_script):
+        assert ".0/24" not in github_script
+        assert "-d $ip -p tcp --dport 443 -j ACCEPT" in github_script
 
     def test_wildcard_uses_cidr_blocks_on_https_only(self):
         script = _build_allowlist_script(["*.example.com"])
@@ -54,13 +53,23 @@ class TestBuildAllowlistScript:
         script = _build_allowlist_script(["*.example.com"])
         assert "getent ahostsv4 example.com" in script
 
-    def test_loopback_allowed(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "-o lo -j ACCEPT" in script
+    def test_loopback_allowed(self, github_script):
+        assert "-o lo -j ACCEPT" in github_script
+
+    def test_established_connections_allowed(self, github_script):
+        assert "ESTABLISHED,RELATED" in github_script
+
 
-    def test_established_connections_allowed(self):
-        script = _build_allowlist_script(["github.com"])
-        assert "ESTABLISHED,RELATED" in script
+_INJECTION_ATTEMPTS = (
+    "evil.com; rm -rf /",
+    "foo$(whoami)",
+    "a b",
+    "",
+    "test`id`",
+    "foo\nbar",
+    "github.com\n",
+    "domain|cat /etc/passwd",
+)
 
 
 class TestDomainValidation:
@@ -76,22 +85,11 @@ class TestDomainValidation:
         ],
     )
     def test_valid_domains_accepted(self, domain):
-        assert _DOMAIN_RE.match(domain)
+        assert _DOMAIN_RE.fullmatch(domain)
 
-    @pytest.mark.parametrize(
-        "domain",
-        [
-            "evil.com; rm -rf /",
-            "foo$(whoami)",
-            "a b",
-            "",
-            "test`id`",
-            "foo\nbar",
-            "domain|cat /etc/passwd",
-        ],
-    )
-    def test_injection_attempts_rejected(self, domain):
-        assert not _DOMAIN_RE.match(domain)
+    def test_injection_attempts_rejected(self):
+        for domain in _INJECTION_ATTEMPTS:
+            assert not _DOMAIN_RE.fullmatch(domain), repr(domain)
 
 
 def test_apply_allowlist_rejects_invalid_domain(mock_runtime):
@@ -99,6 +97,18 @@ def test_apply_allowlist_rejects_invalid_domain(mock_runtime):
         apply_allowlist(mock_runtime, "test", ["evil.com; rm -rf /"])
 
 
+def test_apply_allowlist_rejects_trailing_newline(mock_runtime):
+    with pytest.raises(ValueError, match="Invalid domain"):
+        apply_allowlist(mock_runtime, "test", ["github.com\n"])
+
+
+def test_apply_allowlist_rejects_ip_with_trailing_newline(mock_runtime):
+    with pytest.raises(ValueError, match="Invalid auth proxy IP"):
+        apply_allowlist(
+            mock_runtime, "test", ["github.com"], auth_proxy_endpoint=("10.0.0.1\n", 80)
+        )
+
+
 def test_apply_allowlist_calls_exec(mock_runtime):
     apply_allowlist(mock_runtime, "test", ["github.com"])
     exec_calls = [c for c in mock_runtime.calls if c[0] == "exec"]
@@ -6,8 +6,11 @@ import threading
 import time
 from collections import deque
 
+import pytest
+
 from bubble.relay import (
     GLOBAL_RATE_LIMIT_PER_HOUR,
+    MAX_REQUEST_SIZE,
     MAX_TARGET_LENGTH,
     MAX_TRACKED_CONTAINERS,
     RateLimiter,
@@ -23,6 +26,11 @@ from bubble.relay import (
 # ---------------------------------------------------------------------------
 
 
+def _seed_requests(rl, key, timestamps):
+    """Record past request timestamps for key in every rate window."""
+    rl._requests[key] = [deque(timestamps) for _ in rl._windows]
+
+
 class TestRateLimiter:
     def test_allows_first_request(self):
         rl = RateLimiter()
@@ -51,53 +59,57 @@ class TestRateLimiter:
         rl = RateLimiter()
         now = time.time()
         # Simulate 9 requests spread over 10 minutes (3 per minute window)
-        q = rl._requests.setdefault("c1", deque())
-        for i in range(9):
-            # Each at 2-minute intervals — clears the 1-minute window
-            q.append(now - 600 + i * 65)
+        # Each at 2-minute intervals — clears the 1-minute window
+        _seed_requests(rl, "c1", [now - 600 + i * 65 for i in range(9)])
         # 10th request should still succeed (under 10/10min)
         assert rl.check("c1") is True
 
     def test_ten_minute_limit(self):
         rl = RateLimiter()
         now = time.time()
-        q = rl._requests.setdefault("c1", deque())
-        for i in range(10):
-            q.append(now - 500 + i * 50)
+        _seed_requests(rl, "c1", [now - 500 + i * 50 for i in range(10)])
         assert rl.check("c1") is False
 
     def test_hour_window(self):
         rl = RateLimiter()
         now = time.time()
-        q = rl._requests.setdefault("c1", deque())
-        for i in range(19):
-            q.append(now - 3500 + i * 180)
+        _seed_requests(rl, "c1", [now - 3500 + i * 180 for i in range(19)])
         # Under all windows
         assert rl.check("c1") is True
 
     def test_hour_limit(self):
         rl = RateLimiter()
         now = time.time()
-        q = rl._requests.setdefault("c1", deque())
-        for i in range(20):
-            q.append(now - 3500 + i * 170)
+        _seed_requests(rl, "c1", [now - 3500 + i * 170 for i in range(20)])
         assert rl.check("c1") is False
 
     def test_old_entries_pruned(self):
         rl = RateLimiter()
         now = time.time()
-        q = rl._requests.setdefault("c1", deque())
         # Add entries from over an hour ago
-        for i in range(20):
-            q.append(now - 4000)
+        _seed_requests(rl, "c1", [now - 4000] * 20)
         # Should be pruned and allow new request
         assert rl.check("c1") is True
 
+    def test_windows_pruned_independently(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("bubble.token_store.time.time", lambda: now[0])
+        rl = RateLimiter()
+        for _ in range(3):
+            assert rl.check("c1") is True
+        now[0] += 61
+        assert rl.check("c1") is True
+        # Minute window expired its entries; 10-minute and hour windows kept them
+        assert [len(q) for q in rl._requests["c1"]] == [1, 4, 4]
+
     def test_thread_safety(self):
         rl = RateLimiter()
         results = []
+        # Release all threads at once so the checks actually contend
+        barrier = threading.Barrier(10)
 
         def check():
+            barrier.wait()
             results.append(rl.check("c1"))
 
         threads = [threading.Thread(target=check) for _ in range(10)]
@@ -118,17 +130,32 @@ class TestRateLimiter:
         # New request from any container should be rejected
         assert rl.check("new-container") is False
 
+    def test_global_history_is_bounded(self):
+        rl = RateLimiter()
+        assert rl._global.maxlen == GLOBAL_RATE_LIMIT_PER_HOUR
+
     def test_container_eviction(self):
         rl = RateLimiter()
         now = time.time()
         # Directly populate tracking dict to avoid global rate limit
         for i in range(MAX_TRACKED_CONTAINERS):
-            q = rl._requests.setdefault(f"container-{i}", deque())
-            q.append(now - 3500)  # old enough to not trigger per-container limits
+            # old enough to not trigger per-container limits
+            _seed_requests(rl, f"container-{i}", [now - 3500])
         # Adding one more should evict the oldest, not crash
         assert rl.check("new-container") is True
         assert len(rl._requests) <= MAX_TRACKED_CONTAINERS
 
+    def test_eviction_drops_least_recently_used(self):
+        rl = RateLimiter()
+        now = time.time()
+        for i in range(MAX_TRACKED_CONTAINERS):
+            _seed_requests(rl, f"container-{i}", [now - 3500])
+        # A fresh request moves container-0 to the back of the eviction order
+        assert rl.check("container-0") is True
+        assert rl.check("new-container") is True
+        assert "container-0" in rl._requests
+        assert "container-1" not in rl._requests
+
 
 # ---------------------------------------------------------------------------
 # validate_relay_target
@@ -176,6 +203,11 @@ class TestValidateRelayTarget:
         status, msg = validate_relay_target("--path foo")
         assert status == "error"
 
+    def test_reject_path_flag_inside_simple_target(self):
+        status, msg = validate_relay_target("owner/repo--path")
+        assert status == "error"
+        assert "--path" in msg
+
     def test_reject_dash_prefix(self):
         status, msg = validate_relay_target("--no-interactive")
         assert status == "error"
@@ -255,12 +287,59 @@ class TestValidateRelayTarget:
         status, msg = bubble.relay.validate_relay_target("leanprover/lean4/pull/123")
         assert status == "ok"
 
+    @pytest.mark.parametrize("target", ["github.com/lean4", "www.github.com/lean4"])
+    def test_host_prefixed_short_name(self, relay_env, target):
+        """A GitHub host before a short name is stripped, not taken as the owner."""
+        import bubble.relay
+
+        git_dir = relay_env / "git" / "github.com" / "leanprover"
+        git_dir.mkdir(parents=True)
+        (git_dir / "lean4.git").mkdir()
+        repos_file = relay_env / "repos.json"
+        repos_file.write_text("{}")
+
+        assert bubble.relay.validate_relay_target(target) == ("ok", "")
+
 
 # ---------------------------------------------------------------------------
 # Protocol / JSON handling
 # ---------------------------------------------------------------------------
 
 
+class _MockSock:
+    """In-memory stand-in for the connection handed to _handle_connection."""
+
+    def __init__(self, data: bytes):
+        self._buf = memoryview(data)
+        self._out = bytearray()
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv_into(self, buffer):
+        n = min(len(buffer), len(self._buf))
+        buffer[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+    def sendall(self, data):
+        self._out += data
+
+    def shutdown(self, how):
+        pass
+
+    def close(self):
+        pass
+
+
+def _run_handler(request, rate_limiter, token_registry=None) -> dict:
+    """Run the handler on request (a dict or raw bytes) and decode its reply."""
+    data = request if isinstance(request, bytes) else json.dumps(request).encode()
+    sock = _MockSock(data)
+    _handle_connection(sock, rate_limiter, token_registry=token_registry)
+    return json.loads(sock._out)
+
+
 class TestRelayProtocol:
     def test_send_response(self):
         """Test that _send_response sends valid JSON."""
@@ -294,32 +373,24 @@ class TestRelayProtocol:
 
     def test_handle_empty_data(self):
         """Test handling of empty connection."""
-        s1, s2 = socket.socketpair()
-        rl = RateLimiter()
-        try:
-            s1.shutdown(socket.SHUT_WR)
-            _handle_connection(s2, rl)
-            # Should not crash, just close cleanly
-        finally:
-            s1.close()
-            s2.close()
+        sock = _MockSock(b"")
+        _handle_connection(sock, RateLimiter())
+        # Should not crash, just close cleanly without replying
+        assert sock._out == b""
 
     def test_handle_oversized_request(self):
         """Test that oversized requests are handled."""
-        s1, s2 = socket.socketpair()
-        rl = RateLimiter()
-        try:
-            # Send more than MAX_REQUEST_SIZE bytes
-            big = json.dumps({"target": "a" * 2000})
-            s1.sendall(big.encode())
-            s1.shutdown(socket.SHUT_WR)
-            _handle_connection(s2, rl)
-            data = s1.recv(4096)
-            response = json.loads(data.decode())
-            assert response["status"] == "error"
-        finally:
-            s1.close()
-            s2.close()
+        # Send more than MAX_REQUEST_SIZE bytes
+        response = _run_handler({"target": "a" * 2000}, RateLimiter())
+        assert response["status"] == "error"
+        assert "too large" in response["message"].lower()
+
+    def test_handle_request_at_size_limit(self):
+        """A request of exactly MAX_REQUEST_SIZE bytes is still parsed."""
+        request = json.dumps({"target": "./x"}).encode()
+        request += b" " * (MAX_REQUEST_SIZE - len(request))
+        response = _run_handler(request, RateLimiter())
+        assert "local path" in response["message"].lower()
 
     def test_handle_rate_limited(self):
         """Test rate limiting through the handler (no token auth)."""
@@ -328,36 +399,16 @@ class TestRelayProtocol:
         for _ in range(3):
             rl.check("unknown")
 
-        s1, s2 = socket.socketpair()
-        try:
-            request = json.dumps({"target": "leanprover/lean4"})
-            s1.sendall(request.encode())
-            s1.shutdown(socket.SHUT_WR)
-            # token_registry=None disables auth, container defaults to "unknown"
-            _handle_connection(s2, rl, token_registry=None)
-            data = s1.recv(4096)
-            response = json.loads(data.decode())
-            assert response["status"] == "rate_limited"
-        finally:
-            s1.close()
-            s2.close()
+        # token_registry=None disables auth, container defaults to "unknown"
+        response = _run_handler({"target": "leanprover/lean4"}, rl, token_registry=None)
+        assert response["status"] == "rate_limited"
 
     def test_handle_local_path_rejected(self):
         """Test that local paths are rejected through the handler."""
-        rl = RateLimiter()
-        s1, s2 = socket.socketpair()
-        try:
-            request = json.dumps({"target": "./some/path", "container": "c1"})
-            s1.sendall(request.encode())
-            s1.shutdown(socket.SHUT_WR)
-            _handle_connection(s2, rl, token_registry=None)
-            data = s1.recv(4096)
-            response = json.loads(data.decode())
-            assert response["status"] == "error"
-            assert "local path" in response["message"].lower()
-        finally:
-            s1.close()
-            s2.close()
+        request = {"target": "./some/path", "container": "c1"}
+        response = _run_handler(request, RateLimiter(), token_registry=None)
+        assert response["status"] == "error"
+        assert "local path" in response["message"].lower()
 
 
 # ---------------------------------------------------------------------------
@@ -403,6 +454,36 @@ class TestTokenManagement:
         assert tokens[t1] == "container-1"
         assert tokens[t2] == "container-2"
 
+    def test_tokens_file_owner_only_while_written(self, relay_env, monkeypatch):
+        """The temp file holding the tokens is 0600 from creation, not chmod-ed later."""
+        import os
+
+        import bubble.relay
+        import bubble.token_store
+
+        modes = []
+        real_replace = os.replace
+
+        def checking_replace(src, dst):
+            modes.append(os.stat(src).st_mode & 0o777)
+            return real_replace(src, dst)
+
+        # Neutralise chmod so only the mode the file was created with counts
+        monkeypatch.setattr(bubble.token_store.os, "chmod", lambda *a, **kw: None)
+        monkeypatch.setattr(bubble.token_store.os, "replace", checking_replace)
+        old_umask = os.umask(0o022)
+        try:
+            bubble.relay.generate_relay_token("my-container")
+        finally:
+            os.umask(old_umask)
+
+        assert modes == [0o600]
+        assert bubble.relay.RELAY_TOKENS.stat().st_mode & 0o777 == 0o600
+        # No temp file left behind next to the tokens file
+        prefix = bubble.relay.RELAY_TOKENS.name + "."
+        leftovers = [p.name for p in bubble.relay.RELAY_TOKENS.parent.iterdir()]
+        assert [n for n in leftovers if n.startswith(prefix)] == []
+
     def test_concurrent_token_generation(self, relay_env):
         """Concurrent generate_relay_token calls must not lose tokens.
 
@@ -448,43 +529,46 @@ class TestTokenManagement:
         assert registry.lookup(token) == "my-container"
         assert registry.lookup("invalid-token") is None
 
+    def test_token_registry_sees_write_within_same_mtime(self, relay_env):
+        import os
+
+        import bubble.relay
+
+        registry = bubble.relay.TokenRegistry()
+        t1 = bubble.relay.generate_relay_token("first")
+        assert registry.lookup(t1) == "first"
+        mtime_ns = bubble.relay.RELAY_TOKENS.stat().st_mtime_ns
+        t2 = bubble.relay.generate_relay_token("second")
+        # Simulate a coarse-grained filesystem: the second write keeps the mtime
+        os.utime(bubble.relay.RELAY_TOKENS, ns=(mtime_ns, mtime_ns))
+        assert registry.lookup(t2) == "second"
+
+    def test_token_registry_lookup_unencodable_token(self, relay_env):
+        import bubble.relay
+
+        bubble.relay.generate_relay_token("my-container")
+        registry = bubble.relay.TokenRegistry()
+        # JSON can carry lone surrogates; they must miss, not raise
+        assert registry.lookup("\ud800") is None
+
 
 class TestTokenAuth:
     def test_missing_token_rejected(self):
         """With token registry active, missing token is rejected."""
         rl = RateLimiter()
         tr = TokenRegistry()  # empty registry
-        s1, s2 = socket.socketpair()
-        try:
-            request = json.dumps({"target": "leanprover/lean4"})
-            s1.sendall(request.encode())
-            s1.shutdown(socket.SHUT_WR)
-            _handle_connection(s2, rl, token_registry=tr)
-            data = s1.recv(4096)
-            response = json.loads(data.decode())
-            assert response["status"] == "error"
-            assert "token" in response["message"].lower()
-        finally:
-            s1.close()
-            s2.close()
+        response = _run_handler({"target": "leanprover/lean4"}, rl, token_registry=tr)
+        assert response["status"] == "error"
+        assert "token" in response["message"].lower()
 
     def test_invalid_token_rejected(self):
         """With token registry active, invalid token is rejected."""
         rl = RateLimiter()
         tr = TokenRegistry()
-        s1, s2 = socket.socketpair()
-        try:
-            request = json.dumps({"target": "leanprover/lean4", "token": "fake-token"})
-            s1.sendall(request.encode())
-            s1.shutdown(socket.SHUT_WR)
-            _handle_connection(s2, rl, token_registry=tr)
-            data = s1.recv(4096)
-            response = json.loads(data.decode())
-            assert response["status"] == "error"
-            assert "invalid" in response["message"].lower()
-        finally:
-            s1.close()
-            s2.close()
+        request = {"target": "leanprover/lean4", "token": "fake-token"}
+        response = _run_handler(request, rl, token_registry=tr)
+        assert response["status"] == "error"
+        assert "invalid" in response["message"].lower()
 
     def test_valid_token_accepted(self, relay_env):
         """With valid token, request proceeds to target validation."""
@@ -494,21 +578,12 @@ class TestTokenAuth:
         rl = bubble.relay.RateLimiter()
         tr = bubble.relay.TokenRegistry()
 
-        s1, s2 = socket.socketpair()
-        try:
-            # Target will fail validation (unknown repo), but that's after auth
-            request = json.dumps({"target": "leanprover/lean4", "token": token})
-            s1.sendall(request.encode())
-            s1.shutdown(socket.SHUT_WR)
-            bubble.relay._handle_connection(s2, rl, token_registry=tr)
-            data = s1.recv(4096)
-            response = json.loads(data.decode())
-            # Should get past auth — will fail on unknown_repo or error, not token
-            assert response["status"] in ("unknown_repo", "error")
-            assert "token" not in response["message"].lower()
-        finally:
-            s1.close()
-            s2.close()
+        # Target will fail validation (unknown repo), but that's after auth
+        request = {"target": "leanprover/lean4", "token": token}
+        response = _run_handler(request, rl, token_registry=tr)
+        # Should get past auth — will fail on unknown_repo or error, not token
+        assert response["status"] in ("unknown_repo", "error")
+        assert "token" not in response["message"].lower()
 
     def test_rate_limit_uses_authenticated_name(self, relay_env):
         """Rate limiting is keyed on authenticated container, not spoofable."""
@@ -522,15 +597,6 @@ class TestTokenAuth:
         for _ in range(3):
             rl.check("my-container")
 
-        s1, s2 = socket.socketpair()
-        try:
-            request = json.dumps({"target": "leanprover/lean4", "token": token})
-            s1.sendall(request.encode())
-            s1.shutdown(socket.SHUT_WR)
-            bubble.relay._handle_connection(s2, rl, token_registry=tr)
-            data = s1.recv(4096)
-            response = json.loads(data.decode())
-            assert response["status"] == "rate_limited"
-        finally:
-            s1.close()
-            s2.close()
+        request = {"target": "leanprover/lean4", "token": token}
+        response = _run_handler(request, rl, token_registry=tr)
+        assert response["status"] == "rate_limited"
@@ -89,6 +89,14 @@ class TestRemoteHostValidation:
         with pytest.raises(ValueError, match="Invalid user"):
             RemoteHost.parse("us;er@server")
 
+    def test_hostname_with_trailing_newline_rejected(self):
+        with pytest.raises(ValueError, match="Invalid hostname"):
+            RemoteHost.parse("server\n")
+
+    def test_user_with_trailing_newline_rejected(self):
+        with pytest.raises(ValueError, match="Invalid user"):
+            RemoteHost.parse("kim\n@server")
+
     def test_fqdn_hostname_accepted(self):
         h = RemoteHost.parse("build.example.com")
         assert h.hostname == "build.example.com"
@@ -379,21 +387,31 @@ class TestOpenSshResolvesConfigOptOut:
         assert kw.get("claude_credentials") is False
 
 
+@pytest.fixture(scope="session")
+def shared_bundle():
+    """One bundle for all read-only bundle tests; packing it is the slow part."""
+    bundle = _create_bundle()
+    yield bundle
+    bundle.unlink(missing_ok=True)
+
+
 class TestCreateBundle:
-    def test_creates_tarball(self):
-        bundle = _create_bundle()
-        try:
-            assert bundle.exists()
-            assert bundle.suffix == ".gz"
-            assert bundle.stat().st_size > 0
-
-            # Verify it's a valid tarball containing expected packages
-            with tarfile.open(bundle, "r:gz") as tar:
-                names = tar.getnames()
-                assert any(n.startswith("bubble/") for n in names)
-                assert any(n.startswith("click/") for n in names)
+    def test_creates_tarball(self, shared_bundle):
+        bundle = shared_bundle
+        assert bundle.exists()
+        assert bundle.suffix == ".gz"
+        assert bundle.stat().st_size > 0
+
+        # Verify it's a valid tarball containing expected packages, reading
+        # the members in one streaming pass
+        saw_bubble = saw_click = False
+        with tarfile.open(bundle, "r|gz") as tar:
+            for member in tar:
+                name = member.name
                 # No __pycache__ should be included
-                assert not any("__pycache__" in n for n in names)
-                assert not any(n.endswith(".pyc") for n in names)
-        finally:
-            bundle.unlink(missing_ok=True)
+                assert "__pycache__" not in name
+                assert not name.endswith(".pyc")
+                saw_bubble = saw_bubble or name.startswith("bubble/")
+                saw_click = saw_click or name.startswith("click/")
+        assert saw_bubble
+        assert saw_click
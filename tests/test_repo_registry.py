@@ -94,3 +94,18 @@ class TestRepoRegistry:
         options = reg.get_ambiguous_options("utils")
         assert len(options) == 3
         assert "charlie/utils" in options
+
+    def test_default_repo_resolves(self, tmp_path):
+        reg = RepoRegistry(tmp_path / "repos.json")
+        assert reg.resolve("lean4") == "leanprover/lean4"
+
+    def test_learned_repo_overrides_default(self, tmp_path):
+        reg = RepoRegistry(tmp_path / "repos.json")
+        reg.register("myfork", "lean4")
+        assert reg.resolve("lean4") == "myfork/lean4"
+
+    def test_ambiguity_hides_default(self, tmp_path):
+        reg = RepoRegistry(tmp_path / "repos.json")
+        reg.register("alice", "lean4")
+        reg.register("bob", "lean4")
+        assert reg.resolve("lean4") is None
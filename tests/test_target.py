@@ -1,5 +1,6 @@
 """Tests for the target parsing module."""
 
+import os
 import shutil
 import subprocess
 
@@ -19,18 +20,19 @@ if GIT is None:
     pytest.skip("git not available", allow_module_level=True)
 
 
-@pytest.fixture
-def registry(tmp_path):
-    path = tmp_path / "repos.json"
+# parse_target only reads the registry, so one instance serves the whole module.
+@pytest.fixture(scope="module")
+def registry(tmp_path_factory):
+    path = tmp_path_factory.mktemp("reg") / "repos.json"
     reg = RepoRegistry(path)
     reg.register("leanprover-community", "mathlib4")
     reg.register("leanprover", "lean4")
     return reg
 
 
-@pytest.fixture
-def empty_registry(tmp_path):
-    path = tmp_path / "repos.json"
+@pytest.fixture(scope="module")
+def empty_registry(tmp_path_factory):
+    path = tmp_path_factory.mktemp("reg") / "repos.json"
     return RepoRegistry(path)
 
 
@@ -92,6 +94,12 @@ class TestParsePartialURL:
         assert t.kind == "pr"
         assert t.owner == "leanprover"
 
+    def test_www_host(self, registry):
+        t = parse_target("https://www.github.com/leanprover/lean4/pull/123", registry)
+        assert t.kind == "pr"
+        assert t.owner == "leanprover"
+        assert t.repo == "lean4"
+
     def test_no_host(self, registry):
         t = parse_target("leanprover-community/mathlib4/pull/35219", registry)
         assert t.kind == "pr"
@@ -214,15 +222,11 @@ def _make_git_repo(
         )
 
     if detached and commit:
-        sha = subprocess.run(
-            [GIT, "-C", str(repo), "rev-parse", "HEAD"],
+        subprocess.run(
+            [GIT, "-C", str(repo), "checkout", "--detach"],
             capture_output=True,
-            text=True,
             check=True,
             env=env,
-        ).stdout.strip()
-        subprocess.run(
-            [GIT, "-C", str(repo), "checkout", sha], capture_output=True, check=True, env=env
         )
 
     if dirty:
@@ -231,6 +235,15 @@ def _make_git_repo(
     return repo
 
 
+@pytest.fixture(scope="module")
+def clean_github_repo(tmp_path_factory):
+    """A committed repo on main with a GitHub remote, shared by read-only tests.
+
+    Tests that modify the working tree build their own with _make_git_repo.
+    """
+    return _make_git_repo(tmp_path_factory.mktemp("clean"))
+
+
 # ---------------------------------------------------------------------------
 # Test: _parse_github_remote
 # ---------------------------------------------------------------------------
@@ -268,8 +281,8 @@ class TestParseGithubRemote:
 
 
 class TestParseLocalPath:
-    def test_dot_current_dir(self, tmp_path, monkeypatch):
-        repo = _make_git_repo(tmp_path)
+    def test_dot_current_dir(self, clean_github_repo, monkeypatch):
+        repo = clean_github_repo
         monkeypatch.chdir(repo)
         t = _parse_local_path(".")
         assert t.owner == "testowner"
@@ -278,16 +291,16 @@ class TestParseLocalPath:
         assert t.ref == "main"
         assert t.local_path == str(repo)
 
-    def test_relative_path(self, tmp_path, monkeypatch):
-        repo = _make_git_repo(tmp_path)
-        monkeypatch.chdir(tmp_path)
+    def test_relative_path(self, clean_github_repo, monkeypatch):
+        repo = clean_github_repo
+        monkeypatch.chdir(repo.parent)
         t = _parse_local_path("./repo")
         assert t.owner == "testowner"
         assert t.repo == "testrepo"
         assert t.local_path == str(repo)
 
-    def test_absolute_path(self, tmp_path):
-        repo = _make_git_repo(tmp_path)
+    def test_absolute_path(self, clean_github_repo):
+        repo = clean_github_repo
         t = _parse_local_path(str(repo))
         assert t.owner == "testowner"
         assert t.repo == "testrepo"
@@ -310,6 +323,11 @@ class TestParseLocalPath:
         with pytest.raises(TargetParseError, match="does not exist"):
             _parse_local_path(str(tmp_path / "nonexistent"))
 
+    def test_path_below_a_file(self, tmp_path):
+        (tmp_path / "file.txt").write_text("x\n")
+        with pytest.raises(TargetParseError, match="does not exist"):
+            _parse_local_path(str(tmp_path / "file.txt" / "sub"))
+
     def test_dirty_staged_changes(self, tmp_path):
         """Modified/staged files are rejected."""
         repo = _make_git_repo(tmp_path)
@@ -318,6 +336,24 @@ class TestParseLocalPath:
         with pytest.raises(TargetParseError, match="uncommitted changes"):
             _parse_local_path(str(repo))
 
+    def test_dirty_index_only(self, tmp_path):
+        """A change staged but matching nothing in HEAD is still rejected."""
+        repo = _make_git_repo(tmp_path)
+        (repo / "README.md").write_text("# Staged\n")
+        env = {**_GIT_ENV, "HOME": str(tmp_path)}
+        subprocess.run([GIT, "-C", str(repo), "add", "."], capture_output=True, check=True, env=env)
+        with pytest.raises(TargetParseError, match="uncommitted changes"):
+            _parse_local_path(str(repo))
+
+    def test_touched_file_is_clean(self, tmp_path):
+        """A newer mtime with unchanged content is not a modification."""
+        repo = _make_git_repo(tmp_path)
+        readme = repo / "README.md"
+        st = readme.stat()
+        os.utime(readme, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        t = _parse_local_path(str(repo))
+        assert t.ref == "main"
+
     def test_untracked_files_ok(self, tmp_path):
         """Untracked files are allowed — only tracked modifications matter."""
         repo = _make_git_repo(tmp_path)
@@ -346,6 +382,11 @@ class TestParseLocalPath:
         with pytest.raises(TargetParseError, match="detached"):
             _parse_local_path(str(repo))
 
+    def test_no_commits_yet(self, tmp_path):
+        repo = _make_git_repo(tmp_path, commit=False)
+        with pytest.raises(TargetParseError, match="no commits yet"):
+            _parse_local_path(str(repo))
+
     def test_non_github_remote(self, tmp_path):
         repo = _make_git_repo(tmp_path, remote_url="https://gitlab.com/owner/repo.git")
         with pytest.raises(TargetParseError, match="not a GitHub repository"):
@@ -381,6 +422,14 @@ class TestParseBareNumber:
         assert t.ref == "123"
         assert t.local_path == ""  # bare number doesn't set local_path
 
+    def test_bare_number_with_trailing_slash(self, tmp_path, monkeypatch, registry):
+        repo = _make_git_repo(tmp_path, remote_url="https://github.com/leanprover/lean4.git")
+        monkeypatch.chdir(repo)
+        t = parse_target("123/", registry)
+        assert t.repo == "lean4"
+        assert t.ref == "123"
+        assert t.original == "123/"
+
     def test_bare_number_not_in_git_repo(self, tmp_path, monkeypatch, empty_registry):
         not_repo = tmp_path / "notrepo"
         not_repo.mkdir()
@@ -404,22 +453,22 @@ class TestParseBareNumber:
 
 
 class TestParseTargetLocalPaths:
-    def test_dot_routes_to_local(self, tmp_path, monkeypatch, registry):
-        repo = _make_git_repo(tmp_path)
+    def test_dot_routes_to_local(self, clean_github_repo, monkeypatch, registry):
+        repo = clean_github_repo
         monkeypatch.chdir(repo)
         t = parse_target(".", registry)
         assert t.kind == "branch"
         assert t.local_path == str(repo)
 
-    def test_dotslash_routes_to_local(self, tmp_path, monkeypatch, registry):
-        repo = _make_git_repo(tmp_path)
-        monkeypatch.chdir(tmp_path)
+    def test_dotslash_routes_to_local(self, clean_github_repo, monkeypatch, registry):
+        repo = clean_github_repo
+        monkeypatch.chdir(repo.parent)
         t = parse_target("./repo", registry)
         assert t.kind == "branch"
         assert t.local_path == str(repo)
 
-    def test_absolute_path_routes_to_local(self, tmp_path, registry):
-        repo = _make_git_repo(tmp_path)
+    def test_absolute_path_routes_to_local(self, clean_github_repo, registry):
+        repo = clean_github_repo
         t = parse_target(str(repo), registry)
         assert t.kind == "branch"
         assert t.local_path == str(repo)
@@ -481,6 +530,11 @@ class TestParseIssueURL:
         assert t.kind == "issue"
         assert t.ref == "42"
 
+    def test_issue_url_with_query_and_fragment(self, registry):
+        t = parse_target("https://github.com/leanprover/lean4/issues/42?a=1#b?c", registry)
+        assert t.kind == "issue"
+        assert t.ref == "42"
+
 
 # ---------------------------------------------------------------------------
 # Test: Target dataclass new fields
@@ -1,7 +1,5 @@
 """Tests for VSCode SSH config generation and bubble name validation."""
 
-import subprocess
-
 import pytest
 
 from bubble.remote import RemoteHost
@@ -87,36 +85,36 @@ class TestWarnIfRemoteVscodeClient:
         assert warn_if_remote_vscode_client("vscode", "owner/repo") is False
 
 
+_VALID_BUBBLE_NAMES = (
+    "mathlib4-pr-12345",
+    "lean4-main-20260213",
+    "batteries-branch-fix-grind",
+    "a",
+    "test",
+)
+
+_INVALID_BUBBLE_NAMES = (
+    "UPPER",
+    "123-starts-with-digit",
+    "has spaces",
+    "has;semicolons",
+    "has$(cmd)",
+    "-starts-with-dash",
+    "trailing-newline\n",
+)
+
+
 class TestBubbleNameValidation:
-    @pytest.mark.parametrize(
-        "name",
-        [
-            "mathlib4-pr-12345",
-            "lean4-main-20260213",
-            "batteries-branch-fix-grind",
-            "a",
-            "test",
-        ],
-    )
+    @pytest.mark.parametrize("name", _VALID_BUBBLE_NAMES)
     def test_valid_names_accepted(self, name):
-        assert _BUBBLE_NAME_RE.match(name)
+        assert _BUBBLE_NAME_RE.fullmatch(name)
 
-    @pytest.mark.parametrize(
-        "name",
-        [
-            "UPPER",
-            "123-starts-with-digit",
-            "has spaces",
-            "has;semicolons",
-            "has$(cmd)",
-            "-starts-with-dash",
-        ],
-    )
-    def test_invalid_names_rejected(self, name):
-        assert not _BUBBLE_NAME_RE.match(name)
+    def test_invalid_names_rejected(self):
+        for name in _INVALID_BUBBLE_NAMES:
+            assert not _BUBBLE_NAME_RE.fullmatch(name), repr(name)
 
     def test_empty_string_rejected(self):
-        assert not _BUBBLE_NAME_RE.match("")
+        assert not _BUBBLE_NAME_RE.fullmatch("")
 
 
 class TestAddSshConfig:
@@ -142,6 +140,10 @@ class TestAddSshConfig:
         with pytest.raises(ValueError, match="Invalid bubble name"):
             add_ssh_config("evil; rm -rf /")
 
+    def test_rejects_name_with_trailing_newline(self, tmp_ssh_dir):
+        with pytest.raises(ValueError, match="Invalid bubble name"):
+            add_ssh_config("evil\n")
+
     def test_setup_ssh_writes_runtime_qualified_target(self, tmp_ssh_dir, monkeypatch):
         from bubble import container_helpers
 
@@ -354,20 +356,26 @@ class TestRemoteProxyCommand:
         assert "ssh " not in content.split("ProxyCommand")[1].split("\n")[0]  # no ssh in proxy
 
 
+@pytest.fixture
+def captured_vscode_calls(monkeypatch):
+    """Record the argv of every subprocess.run call bubble.vscode makes."""
+    calls = []
+    monkeypatch.setattr("bubble.vscode.subprocess.run", lambda cmd, **kw: calls.append(cmd))
+    return calls
+
+
 class TestOpenVscodeWorkspace:
-    def test_folder_uri_without_workspace(self, monkeypatch):
+    def test_folder_uri_without_workspace(self, captured_vscode_calls):
         """Without workspace file, uses --folder-uri."""
-        calls = []
-        monkeypatch.setattr(subprocess, "run", lambda cmd, **kw: calls.append(cmd))
+        calls = captured_vscode_calls
         open_vscode("test-bubble", "/home/user/lean4")
         assert len(calls) == 1
         assert "--folder-uri" in calls[0]
         assert "--file-uri" not in calls[0]
 
-    def test_file_uri_with_workspace(self, monkeypatch):
+    def test_file_uri_with_workspace(self, captured_vscode_calls):
         """With workspace file, uses --file-uri."""
-        calls = []
-        monkeypatch.setattr(subprocess, "run", lambda cmd, **kw: calls.append(cmd))
+        calls = captured_vscode_calls
         open_vscode(
             "test-bubble",
             "/home/user/lean4",
@@ -377,10 +385,9 @@ class TestOpenVscodeWorkspace:
         assert "--file-uri" in calls[0]
         assert "--folder-uri" not in calls[0]
 
-    def test_workspace_uri_format(self, monkeypatch):
+    def test_workspace_uri_format(self, captured_vscode_calls):
         """Workspace file URI has correct format."""
-        calls = []
-        monkeypatch.setattr(subprocess, "run", lambda cmd, **kw: calls.append(cmd))
+        calls = captured_vscode_calls
         open_vscode(
             "test-bubble",
             "/home/user/lean4",